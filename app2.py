@@ -8,25 +8,80 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+import hashlib
+import html
+import inspect
 import json
 import os
 import re
+import signal
 import subprocess
 import sys
 import threading
 import time
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
 from datetime import datetime
 from pathlib import Path
+from types import SimpleNamespace
 from urllib.parse import urlparse
 
+URL_RE = re.compile(r'https?://\S+')
+
+def first_url(text, default=None):
+    """Return the first URL in text; search stops at the first match"""
+    url_match = URL_RE.search(text)
+    return url_match.group(0) if url_match else default
+
+def find_task_block(content):
+    """Return the (start, end) span of the triple-quoted TASK assignment in content, or None"""
+    def skip_space(pos):
+        while pos < len(content) and content[pos].isspace():
+            pos += 1
+        return pos
+
+    # Plain string scans: linear passes, no regex backtracking over the source
+    start = content.find('TASK')
+    while start >= 0:
+        pos = skip_space(start + len('TASK'))
+        if content.startswith('=', pos):
+            pos = skip_space(pos + 1)
+            if content.startswith('"""', pos):
+                end = content.find('"""', pos + len('"""'))
+                if end >= 0:
+                    return start, end + len('"""')
+        start = content.find('TASK', start + len('TASK'))
+    return None
+
+STEPS = (
+    "🤖 AI Planner Analysis",
+    "🌐 Network Logging",
+    "⚙️ Test Steps Generation",
+    "🎯 JMX Script Creation",
+    "🔍 JMX Validation",
+)
+
+# Lines of script output kept in memory and shown while a stage runs
+OUTPUT_TAIL_LINES = 200
+
+@st.cache_resource
+def load_agents():
+    """Import the agent modules once per process instead of on every rerun"""
+    import log
+    import TestSteps
+    import PTScript
+    import validation
+    print("✅ All modules (log.py, TestSteps.py, PTScript.py, validation.py) loaded successfully!")
+    return SimpleNamespace(log=log, test_steps=TestSteps, jmx=PTScript, validation=validation)
+
 # Import the existing modules
 try:
-    import log as network_logger_module
-    import TestSteps as test_steps_module  
-    import PTScript as jmx_generator_module
-    import validation as validation_module
+    agents = load_agents()
+    network_logger_module = agents.log
+    test_steps_module = agents.test_steps
+    jmx_generator_module = agents.jmx
+    validation_module = agents.validation
     MODULES_AVAILABLE = True
-    print("✅ All modules (log.py, TestSteps.py, PTScript.py, validation.py) loaded successfully!")
 except ImportError as e:
     MODULES_AVAILABLE = False
     st.error(f"❌ Error importing modules: {e}")
@@ -34,6 +89,7 @@ except ImportError as e:
     st.stop()
 
 # Custom CSS
+# Emitted on every run: Streamlit removes elements that a rerun does not re-send
 st.markdown("""
 <style>
     .main-header {
@@ -127,21 +183,96 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+def render_progress(step_names):
+    """Render the step list and progress bar for the current workflow step"""
+    html_parts = []
+    for i, step_name in enumerate(step_names):
+        if i < st.session_state.workflow_step:
+            html_parts.append(f'<div class="progress-step step-completed">✅ {step_name}</div>')
+        elif i == st.session_state.workflow_step:
+            html_parts.append(f'<div class="progress-step step-current">🔄 {step_name}</div>')
+        else:
+            html_parts.append(f'<div class="progress-step step-pending">⏳ {step_name}</div>')
+    # One markdown element for the whole list instead of one per step
+    st.markdown(''.join(html_parts), unsafe_allow_html=True)
+    
+    progress_percent = (st.session_state.workflow_step / len(step_names)) * 100
+    st.progress(progress_percent / 100)
+
+def kill_process_group(process):
+    """Kill a script started in its own session together with any children still holding its pipes"""
+    if hasattr(os, 'killpg'):
+        try:
+            os.killpg(process.pid, signal.SIGKILL)
+        except OSError:
+            pass
+    if process.poll() is None:
+        process.kill()
+        process.wait()
+
+def main_takes_task(module):
+    """Check whether module.main() accepts the TASK as a task argument"""
+    main = getattr(module, 'main', None)
+    return callable(main) and 'task' in inspect.signature(main).parameters
+
+@st.cache_resource
+def log_task_lock():
+    """Lock shared by all sessions around rewriting and running log.py"""
+    return threading.Lock()
+
+@st.cache_resource
+def abandoned_stages():
+    """Timed-out stage main() calls that are still running; shared by all sessions since they write the same output directories"""
+    return set()
+
+@st.cache_resource
+def get_validation_components():
+    """Create the JMX validator and executor once per process; failures raise, so they are not cached"""
+    return validation_module.JMXValidator(), validation_module.JMeterExecutor()
+
+def validation_components():
+    """Validator and executor, or (None, None) if they cannot be created; failed creation is retried on the next call"""
+    if MODULES_AVAILABLE and validation_module:
+        try:
+            return get_validation_components()
+        except Exception as e:
+            print(f"Warning: Could not initialize validation components: {e}")
+    return None, None
+
+@st.cache_data(ttl=5)
+def list_jmx_files(root_mtime, root='JMX_SCRIPT_OUTPUT'):
+    """List JMX files under root; root_mtime keys the cache so unchanged directories are not re-walked"""
+    return [str(path) for path in Path(root).rglob('*.jmx')]
+
+def find_jmx_files(root='JMX_SCRIPT_OUTPUT'):
+    """Find generated JMX files, reusing the cached listing while the directory is unchanged"""
+    try:
+        root_mtime = os.stat(root).st_mtime_ns
+    except FileNotFoundError:
+        return []
+    return list_jmx_files(root_mtime, root)
+
+def file_digest(path):
+    """Content hash of a file, used as a cache key"""
+    with open(path, 'rb') as f:
+        return hashlib.blake2b(f.read(), digest_size=16).hexdigest()
+
+# Called from validation worker threads, which have no script context to draw a spinner in
+@st.cache_data(show_spinner=False)
+def validate_cached(path, content_hash):
+    """Validate a JMX file; the result is reused while the file content is unchanged"""
+    validator, _ = get_validation_components()
+    return validator.validate_jmx_file(path)
+
 # Automated Workflow Class
 class AutomatedWorkflow:
-    def __init__(self):
-        self.reset_progress()
-        if MODULES_AVAILABLE and validation_module:
-            try:
-                self.validator = validation_module.JMXValidator()
-                self.executor = validation_module.JMeterExecutor()
-            except Exception as e:
-                print(f"Warning: Could not initialize validation components: {e}")
-                self.validator = None
-                self.executor = None
-        else:
-            self.validator = None
-            self.executor = None
+    @property
+    def validator(self):
+        return validation_components()[0]
+    
+    @property
+    def executor(self):
+        return validation_components()[1]
     
     def reset_progress(self):
         """Reset workflow progress"""
@@ -150,36 +281,27 @@ class AutomatedWorkflow:
         st.session_state.automation_status = "ready"
         st.session_state.current_step_message = ""
         st.session_state.target_url = ""
-        
-    def get_steps(self):
-        """Get workflow steps configuration"""
-        return [
-            {"name": "🤖 AI Planner Analysis", "status": "pending", "message": ""},
-            {"name": "🌐 Network Logging", "status": "pending", "message": ""},
-            {"name": "⚙️ Test Steps Generation", "status": "pending", "message": ""},
-            {"name": "🎯 JMX Script Creation", "status": "pending", "message": ""},
-            {"name": "🔍 JMX Validation", "status": "pending", "message": ""}
-        ]
-
-    def update_task_in_log_file(self, user_story):
+
+    def build_task(self, user_story, target_url):
+        """Build the log.py TASK text for a user story"""
+        return f"""
+As a user,
+I want to go to {target_url},
+{user_story}
+And verify the task is completed.
+"""
+
+    def update_task_in_log_file(self, user_story, target_url):
         """Update TASK in log.py file based on user story"""
         try:
             with open('log.py', 'r', encoding='utf-8') as f:
                 content = f.read()
             
-            urls = re.findall(r'https?://[^\s]+', user_story)
-            target_url = urls[0] if urls else "https://example.com"
-            
-            new_task = f'''TASK = """
-As a user,
-I want to go to {target_url},
-{user_story}
-And verify the task is completed.
-"""'''
+            new_task = f'''TASK = """{self.build_task(user_story, target_url)}"""'''
             
-            task_pattern = r'TASK\s*=\s*""".*?"""'
-            if re.search(task_pattern, content, re.DOTALL):
-                updated_content = re.sub(task_pattern, new_task, content, flags=re.DOTALL)
+            span = find_task_block(content)
+            if span:
+                updated_content = content[:span[0]] + new_task + content[span[1]:]
             else:
                 lines = content.split('\n')
                 insert_index = 0
@@ -198,33 +320,71 @@ And verify the task is completed.
             st.error(f"Failed to update TASK in log.py: {e}")
             return None
 
-    def run_script_with_timeout(self, script_name, timeout=300):
-        """Run script with timeout and return result"""
+    def run_script_with_timeout(self, script_name, timeout=300, task=None):
+        """Run script with timeout, showing the tail of its output while it runs"""
+        output_tail = deque(maxlen=OUTPUT_TAIL_LINES)
+        tail_container = st.empty()
         try:
             env = os.environ.copy()
             env['PYTHONUNBUFFERED'] = '1'
+            if task:
+                env['PT_TASK'] = task
             
-            result = subprocess.run(
+            process = subprocess.Popen(
                 [sys.executable, script_name],
-                capture_output=True,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                bufsize=1,
                 text=True,
-                timeout=timeout,
+                encoding='utf-8',
+                errors='replace',
                 env=env,
-                cwd=os.getcwd()
+                cwd=os.getcwd(),
+                start_new_session=True
             )
+            reader = threading.Thread(target=output_tail.extend, args=(process.stdout,), daemon=True)
+            reader.start()
+            
+            deadline = time.monotonic() + timeout
+            shown_tail = None
+            while True:
+                try:
+                    process.wait(timeout=0.5)
+                    break
+                except subprocess.TimeoutExpired:
+                    if time.monotonic() > deadline:
+                        kill_process_group(process)
+                        raise
+                tail = ''.join(output_tail.copy())
+                if tail != shown_tail:
+                    tail_container.code(tail)
+                    shown_tail = tail
             
+            # A grandchild (e.g. a browser) can keep the pipe open after the script exits
+            reader.join(max(0, deadline - time.monotonic()))
+            if reader.is_alive():
+                kill_process_group(process)
+                raise subprocess.TimeoutExpired(script_name, timeout)
+            process.stdout.close()
+            
+            # stderr is merged into stdout, so the output tail doubles as the error report
+            output = ''.join(output_tail)
             return {
-                "success": result.returncode == 0,
-                "returncode": result.returncode,
-                "stdout": result.stdout,
-                "stderr": result.stderr
+                "success": process.returncode == 0,
+                "returncode": process.returncode,
+                "stdout": output,
+                "stderr": output if process.returncode != 0 else ""
             }
             
         except subprocess.TimeoutExpired:
+            # Killing the process group closes the pipe's write ends, so the reader can finish
+            reader.join(1)
+            if not reader.is_alive():
+                process.stdout.close()
             return {
                 "success": False,
                 "returncode": -1,
-                "stdout": "",
+                "stdout": ''.join(output_tail.copy()),
                 "stderr": f"Script execution timed out after {timeout} seconds"
             }
         except Exception as e:
@@ -234,9 +394,60 @@ And verify the task is completed.
                 "stdout": "",
                 "stderr": str(e)
             }
+        finally:
+            tail_container.empty()
+
+    def run_main_with_timeout(self, main, timeout=300, **kwargs):
+        """Run a stage module's main() with a timeout; returns the same fields as run_script_with_timeout"""
+        executor = ThreadPoolExecutor(max_workers=1)
+        future = executor.submit(main, **kwargs)
+        try:
+            output = future.result(timeout=timeout)
+        except FuturesTimeoutError:
+            # Keep it so no new workflow starts while it can still write stage outputs
+            stages = abandoned_stages()
+            stages.add(future)
+            future.add_done_callback(stages.discard)
+            return {
+                "success": False,
+                "returncode": -1,
+                "stdout": "",
+                "stderr": f"Stage execution timed out after {timeout} seconds"
+            }
+        except Exception as e:
+            return {
+                "success": False,
+                "returncode": -1,
+                "stdout": "",
+                "stderr": str(e)
+            }
+        finally:
+            # A timed-out main() cannot be stopped; let it finish in the background
+            executor.shutdown(wait=False)
+        
+        return {
+            "success": True,
+            "returncode": 0,
+            "stdout": "",
+            "stderr": "",
+            "output": str(output)
+        }
+
+    def run_stage(self, module, script_name, timeout=300, task=None):
+        """Run a stage module's main() in-process, falling back to running the script"""
+        if task is not None and main_takes_task(module):
+            return self.run_main_with_timeout(module.main, timeout=timeout, task=task)
+        if task is None and hasattr(module, 'main'):
+            return self.run_main_with_timeout(module.main, timeout=timeout)
+        return self.run_script_with_timeout(script_name, timeout=timeout, task=task)
 
     def execute_automated_workflow(self, user_story):
         """Execute the complete automated workflow"""
+        if any(not future.done() for future in abandoned_stages()):
+            st.error("❌ A timed-out stage from an earlier run is still running. Please try again once it has finished.")
+            st.session_state.automation_status = "failed"
+            return
+        
         try:
             st.session_state.automation_status = "running"
             
@@ -249,11 +460,9 @@ And verify the task is completed.
                 st.markdown('<div class="automation-status">🤖 AI Planner is analyzing your user story...</div>', unsafe_allow_html=True)
             
             st.session_state.workflow_step = 0
-            time.sleep(2)  # Simulate analysis time
             
             # Extract URL and plan
-            urls = re.findall(r'https?://[^\s]+', user_story)
-            target_url = urls[0] if urls else "https://example.com"
+            target_url = first_url(user_story, "https://example.com")
             st.session_state.target_url = target_url
             
             planning_message = f"""✅ **Analysis Complete!**
@@ -284,14 +493,21 @@ And verify the task is completed.
                 return
 
             with st.spinner("🌐 Executing network traffic capture..."):
-                # Update log.py with user story
-                if not self.update_task_in_log_file(user_story):
-                    st.error("❌ Failed to update TASK in log.py")
-                    st.session_state.automation_status = "failed"
-                    return
-
-                # Execute log.py
-                result = self.run_script_with_timeout('log.py', timeout=300)
+                task = self.build_task(user_story, target_url)
+                if main_takes_task(network_logger_module):
+                    # The TASK is passed to main(); log.py and its module state are left untouched
+                    result = self.run_stage(network_logger_module, 'log.py', timeout=300, task=task)
+                else:
+                    # Script fallback for a log.py that reads its own TASK: rewrite it for this story,
+                    # holding a lock shared by all sessions so none of them runs another's TASK
+                    with log_task_lock():
+                        if not self.update_task_in_log_file(user_story, target_url):
+                            st.error("❌ Failed to update TASK in log.py")
+                            st.session_state.automation_status = "failed"
+                            return
+
+                        # Execute log.py
+                        result = self.run_stage(network_logger_module, 'log.py', timeout=300, task=task)
                 
                 if result["success"]:
                     message = f"""✅ **Network Logging Complete!**
@@ -301,7 +517,7 @@ And verify the task is completed.
                     st.success(message)
                     st.session_state.results['network_logging'] = result
                 else:
-                    st.error(f"❌ Network logging failed: {result['stderr']}")
+                    st.error(f"❌ Network logging failed: {result.get('stderr', 'Unknown error')}")
                     st.session_state.automation_status = "failed"
                     return
 
@@ -316,25 +532,22 @@ And verify the task is completed.
 
             with st.spinner("⚙️ Generating test steps with correlation mapping..."):
                 # Execute TestSteps.py
-                if hasattr(test_steps_module, 'main'):
-                    result = test_steps_module.main()
-                    result = {"status": "success", "output": str(result)}
-                else:
-                    result = self.run_script_with_timeout('TestSteps.py', timeout=120)
+                result = self.run_stage(test_steps_module, 'TestSteps.py', timeout=120)
                 
-                if result.get("success", True):
-                    # Check output files
-                    output_files = []
-                    expected_files = [
-                        'TestSteps_Output/test_steps_structured.json',
-                        'TestSteps_Output/test_steps_simple.json',
-                        'TestSteps_Output/TestSteps.txt',
-                        'TestSteps_Output/correlation_rules.json'
+                if result["success"]:
+                    # Check output files with one directory read instead of a stat per file
+                    expected_names = [
+                        'test_steps_structured.json',
+                        'test_steps_simple.json',
+                        'TestSteps.txt',
+                        'correlation_rules.json'
                     ]
-                    
-                    for file_path in expected_files:
-                        if os.path.exists(file_path):
-                            output_files.append(file_path)
+                    try:
+                        with os.scandir('TestSteps_Output') as entries:
+                            present = {entry.name for entry in entries} & set(expected_names)
+                    except FileNotFoundError:
+                        present = set()
+                    output_files = [f'TestSteps_Output/{name}' for name in expected_names if name in present]
                     
                     message = f"""✅ **Test Steps Generation Complete!**
 • Files created: {len(output_files)}
@@ -360,21 +573,11 @@ And verify the task is completed.
             with st.spinner("🎯 Creating JMX scripts for JMeter..."):
                 os.makedirs('JMX_SCRIPT_OUTPUT', exist_ok=True)
                 
-                if hasattr(jmx_generator_module, 'main'):
-                    result = jmx_generator_module.main()
-                    result = {"status": "success", "output": str(result)}
-                    time.sleep(1)
-                else:
-                    result = self.run_script_with_timeout('PTScript.py', timeout=180)
+                result = self.run_stage(jmx_generator_module, 'PTScript.py', timeout=180)
                 
-                if result.get("success", True):
+                if result["success"]:
                     # Find JMX files
-                    jmx_files = []
-                    if os.path.exists('JMX_SCRIPT_OUTPUT'):
-                        for root, dirs, files in os.walk('JMX_SCRIPT_OUTPUT'):
-                            for file in files:
-                                if file.endswith('.jmx'):
-                                    jmx_files.append(os.path.join(root, file))
+                    jmx_files = find_jmx_files()
                     
                     message = f"""✅ **JMX Generation Complete!**
 • JMX files created: {len(jmx_files)}
@@ -406,23 +609,24 @@ And verify the task is completed.
                         st.session_state.automation_status = "failed"
                         return
 
-                    validation_results = []
+                    # Validate files in parallel; parsing is mostly I/O and C-extension work
+                    with ThreadPoolExecutor(max_workers=min(8, len(jmx_files))) as executor:
+                        validation_results = list(executor.map(
+                            lambda jmx_file: {"file": jmx_file, "result": validate_cached(jmx_file, file_digest(jmx_file))},
+                            jmx_files
+                        ))
                     
-                    for jmx_file in jmx_files:
-                        validation_result = self.validator.validate_jmx_file(jmx_file)
-                        validation_results.append({
-                            "file": jmx_file,
-                            "result": validation_result
-                        })
-                        
-                        # Generate validation report
-                        report_path = f"validation_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-                        self.validator.generate_validation_report(validation_result, report_path)
+                    # Generate one aggregate validation report for all files
+                    report_path = f"validation_report_{datetime.now():%Y%m%d_%H%M%S}.json"
+                    with open(report_path, 'w', encoding='utf-8') as f:
+                        json.dump({vr["file"]: vr["result"] for vr in validation_results}, f, default=str)
+                    st.session_state.results['validation_report'] = report_path
 
                     # Summary of results
-                    passed = sum(1 for vr in validation_results if vr['result'].get('overall_status') == 'pass')
-                    warnings = sum(1 for vr in validation_results if vr['result'].get('overall_status') == 'warning')
-                    failed = sum(1 for vr in validation_results if vr['result'].get('overall_status') == 'fail')
+                    status_counts = Counter(vr['result'].get('overall_status') for vr in validation_results)
+                    passed = status_counts['pass']
+                    warnings = status_counts['warning']
+                    failed = status_counts['fail']
 
                     message = f"""✅ **Validation Complete!**
 
@@ -458,24 +662,40 @@ Your complete JMeter test suite is ready for execution."""
     def display_progress_inline(self, container):
         """Display progress in the given container"""
         with container.container():
-            steps = self.get_steps()
-            
-            for i, step in enumerate(steps):
-                if i < st.session_state.workflow_step:
-                    st.markdown(f'<div class="progress-step step-completed">✅ {step["name"]}</div>', unsafe_allow_html=True)
-                elif i == st.session_state.workflow_step:
-                    st.markdown(f'<div class="progress-step step-current">🔄 {step["name"]}</div>', unsafe_allow_html=True)
-                else:
-                    st.markdown(f'<div class="progress-step step-pending">⏳ {step["name"]}</div>', unsafe_allow_html=True)
-            
-            progress_percent = (st.session_state.workflow_step / len(steps)) * 100
-            st.progress(progress_percent / 100)
+            render_progress(STEPS)
+
+@st.cache_resource
+def get_workflow():
+    """Shared workflow instance; all per-session progress lives in st.session_state"""
+    return AutomatedWorkflow()
+
+def render_message(message):
+    """Render one chat message as HTML"""
+    # Escaped so markup in one message cannot swallow the rest of the shared history element
+    content = html.escape(message["content"])
+    if message["role"] == "user":
+        return f'<div class="chat-message user-message"><strong>You:</strong><br>{content}</div>\n\n'
+    return f'<div class="chat-message assistant-message"><strong>Assistant:</strong><br>{content}</div>\n\n'
+
+def add_message(role, content):
+    """Append a chat message and extend the cached history HTML"""
+    message = {"role": role, "content": content}
+    st.session_state.messages.append(message)
+    st.session_state.messages_html += render_message(message)
+
+def clear_messages():
+    """Clear the chat history and its cached HTML"""
+    st.session_state.messages = []
+    st.session_state.messages_html = ""
 
 # Initialize session state
 if 'messages' not in st.session_state:
     st.session_state.messages = []
+if 'messages_html' not in st.session_state:
+    st.session_state.messages_html = ''.join(render_message(m) for m in st.session_state.messages)
 if 'workflow' not in st.session_state:
-    st.session_state.workflow = AutomatedWorkflow()
+    st.session_state.workflow = get_workflow()
+    st.session_state.workflow.reset_progress()
 if 'workflow_step' not in st.session_state:
     st.session_state.workflow_step = 0
 if 'results' not in st.session_state:
@@ -485,24 +705,7 @@ if 'automation_status' not in st.session_state:
 
 def display_progress():
     """Display workflow progress in sidebar"""
-    steps = [
-        "🤖 AI Planner Analysis",
-        "🌐 Network Logging",
-        "⚙️ Test Steps Generation ", 
-        "🎯 JMX Script Creation",
-        "🔍 JMX Validation",
-    ]
-    
-    for i, step in enumerate(steps):
-        if i < st.session_state.workflow_step:
-            st.markdown(f'<div class="progress-step step-completed">✅ {step}</div>', unsafe_allow_html=True)
-        elif i == st.session_state.workflow_step:
-            st.markdown(f'<div class="progress-step step-current">🔄 {step}</div>', unsafe_allow_html=True)
-        else:
-            st.markdown(f'<div class="progress-step step-pending">⏳ {step}</div>', unsafe_allow_html=True)
-    
-    progress_percent = (st.session_state.workflow_step / len(steps)) * 100
-    st.progress(progress_percent / 100)
+    render_progress(STEPS)
 
 def main():
     # Header
@@ -575,11 +778,9 @@ def main():
         # Chat messages
         chat_container = st.container()
         with chat_container:
-            for message in st.session_state.messages:
-                if message["role"] == "user":
-                    st.markdown(f'<div class="chat-message user-message"><strong>You:</strong><br>{message["content"]}</div>', unsafe_allow_html=True)
-                else:
-                    st.markdown(f'<div class="chat-message assistant-message"><strong>Assistant:</strong><br>{message["content"]}</div>', unsafe_allow_html=True)
+            # The whole history is one element, rendered incrementally as messages arrive
+            if st.session_state.messages_html:
+                st.markdown(st.session_state.messages_html, unsafe_allow_html=True)
         
         # Input section
         st.subheader("🚀 Start Automated Workflow")
@@ -600,12 +801,11 @@ def main():
             if st.button("🚀 Start Automation", disabled=input_disabled or not user_input.strip()):
                 if user_input.strip():
                     # Check for URL in user story
-                    urls = re.findall(r'https?://[^\s]+', user_input)
-                    if not urls:
+                    if not first_url(user_input):
                         st.error("❓ Please provide a user story with a URL (e.g., 'Test login for https://example.com')")
                     else:
                         # Add user message
-                        st.session_state.messages.append({"role": "user", "content": user_input})
+                        add_message("user", user_input)
                         
                         # Start automated workflow
                         response = f"""🚀 **Automated Workflow Started!**
@@ -622,7 +822,7 @@ def main():
 
 ⏱️ **Estimated time**: 5-10 minutes"""
                         
-                        st.session_state.messages.append({"role": "assistant", "content": response})
+                        add_message("assistant", response)
                         
                         # Execute workflow
                         st.session_state.workflow.execute_automated_workflow(user_input)
@@ -631,7 +831,7 @@ def main():
         with col_btn2:
             if st.button("🔄 New Test"):
                 st.session_state.workflow.reset_progress()
-                st.session_state.messages = []
+                clear_messages()
                 st.rerun()
     
     with col2:
@@ -648,7 +848,7 @@ def main():
         with col_action1:
             if st.button("🔄 Reset"):
                 st.session_state.workflow.reset_progress()
-                st.session_state.messages = []
+                clear_messages()
                 st.rerun()
         
         with col_action2:
@@ -695,16 +895,11 @@ def main():
                 try:
                     workflow = st.session_state.workflow
                     # Simple validation without full workflow
-                    jmx_files = []
-                    if os.path.exists('JMX_SCRIPT_OUTPUT'):
-                        for root, dirs, files in os.walk('JMX_SCRIPT_OUTPUT'):
-                            for file in files:
-                                if file.endswith('.jmx'):
-                                    jmx_files.append(os.path.join(root, file))
+                    jmx_files = find_jmx_files()
                     
                     if jmx_files and workflow.validator:
                         for jmx_file in jmx_files:
-                            validation_result = workflow.validator.validate_jmx_file(jmx_file)
+                            validation_result = validate_cached(jmx_file, file_digest(jmx_file))
                             status = validation_result.get('overall_status', 'unknown')
                             if status == 'pass':
                                 st.success(f"✅ {os.path.basename(jmx_file)}: PASSED")
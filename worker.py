@@ -0,0 +1,54 @@
+"""Long-lived stage worker used by app.py when STAGE_WORKERS is enabled.
+
+Usage: python -u worker.py <module_name>
+
+The stage module is imported once. Each line on stdin is a JSON job
+{"func": "run", "kwargs": {...}} and each result is written back as one JSON
+line {"success", "returncode", "stdout", "stderr"}.
+"""
+import contextlib
+import importlib
+import io
+import json
+import os
+import sys
+
+
+def main():
+    # Keep the real stdout for the job protocol; anything else written to fd 1
+    # (including child processes of the stage) goes to stderr instead
+    protocol = os.fdopen(os.dup(sys.stdout.fileno()), 'w', encoding='utf-8')
+    os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+
+    with contextlib.redirect_stdout(sys.stderr):
+        module = importlib.import_module(sys.argv[1])
+
+    for line in sys.stdin:
+        job = json.loads(line)
+        stdout = io.StringIO()
+        stderr = io.StringIO()
+        try:
+            with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+                output = getattr(module, job.get('func', 'run'))(**job.get('kwargs', {}))
+            result = {
+                "success": True,
+                "returncode": 0,
+                "stdout": stdout.getvalue(),
+                "stderr": stderr.getvalue()
+            }
+            if isinstance(output, dict):
+                result.update(output)
+        except Exception as e:
+            result = {
+                "success": False,
+                "returncode": -1,
+                "stdout": stdout.getvalue(),
+                "stderr": stderr.getvalue() or str(e)
+            }
+
+        protocol.write(json.dumps(result, default=str) + '\n')
+        protocol.flush()
+
+
+if __name__ == '__main__':
+    main()